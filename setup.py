@@ -25,12 +25,16 @@ setuptools.setup(
         "mypy_extensions",
         "redis",
         "cloudpickle",
-        "rq>=1.7",
+        "rq>=1.9",
         "loguru",
         'importlib-metadata ~= 1.0 ; python_version < "3.8"',
         'typing_extensions ; python_version < "3.8"',
         "chevron",
     ],
+    extras_require={
+        # faster json dumps for debug outputs
+        "fast": ["orjson"],
+    },
     entry_points="""
         [console_scripts]
         funsies=funsies._cli:main
@@ -31,7 +31,9 @@ class Encoding(str, Enum):
 # Utility functions
 def join(prefix: str, address: hash_t, *suffix: str) -> str:
     """Make a redis identifier."""
-    return ":".join([prefix, str(address)] + list(suffix))
+    if suffix:
+        return f"{prefix}:{address}:{':'.join(suffix)}"
+    return f"{prefix}:{address}"
 
 
 # Some locations
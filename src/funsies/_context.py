@@ -20,7 +20,7 @@ from rq.local import LocalStack
 from ._constants import _AnyPath, hash_t, join, OPERATIONS
 from ._logging import logger
 from ._storage import StorageEngine
-from .config import Options, Server
+from .config import _close_pool, Options, Server
 
 # A thread local stack of connections (adapted from RQ)
 _options_stack = LocalStack()
@@ -218,15 +218,8 @@ def ManagedFun(
 
     logger.debug(f"running redis-server in {dir}")
 
-    if worker_args is not None:
-        wargs = [el for el in worker_args]
-    else:
-        wargs = []
-
-    if redis_args is not None:
-        rargs = [el for el in redis_args]
-    else:
-        rargs = []
+    wargs = list(worker_args) if worker_args is not None else []
+    rargs = list(redis_args) if redis_args is not None else []
 
     if pw is None:
         # std
@@ -237,7 +230,7 @@ def ManagedFun(
     # Start redis
     port = 16379
     url = f"redis://:{pw}@localhost:{port}"
-    cmdline = ["redis-server"] + rargs + ["--port", f"{port}", "--requirepass" f" {pw}"]
+    cmdline = ["redis-server", *rargs, "--port", f"{port}", "--requirepass" f" {pw}"]
     if data_url is None:
         data_url = url
     server = Server(jobs_url=url, data_url=data_url)
@@ -262,7 +255,7 @@ def ManagedFun(
     logger.debug(f"spawning {nworkers} funsies workers")
     worker_pool = [
         subprocess.Popen(
-            ["funsies", "--jobs", url, "--data", data_url, "worker"] + wargs, cwd=dir
+            ["funsies", "--jobs", url, "--data", data_url, "worker", *wargs], cwd=dir
         )
         for i in range(nworkers)
     ]
@@ -279,7 +272,8 @@ def ManagedFun(
             w.wait()
         # stop db
         db.shutdown()  # type:ignore
-        db.connection_pool.disconnect()
+        # the server is gone, so its pool can't be reused
+        _close_pool(url)
         redis_server.wait()
         if directory is None:
             shutil.rmtree(dir)
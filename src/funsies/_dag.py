@@ -2,35 +2,63 @@
 from __future__ import annotations
 
 # std
+from collections import deque
 import time
-from typing import Any, Optional
+from typing import Any, cast, FrozenSet, Iterable, Optional, Tuple
 
 # external
 from redis import Redis
 import rq
-from rq.queue import Queue
+from rq.queue import EnqueueData, Queue
 from rq.worker import Worker
 
 # module
-from ._constants import DAG_INDEX, DAG_OPERATIONS, DAG_STATUS, hash_t, join, OPERATIONS
+from ._constants import (
+    ARTEFACTS,
+    DAG_INDEX,
+    DAG_OPERATIONS,
+    DAG_STATUS,
+    hash_t,
+    join,
+    OPERATIONS,
+)
 from ._context import get_storage
-from ._graph import Artefact, get_op_options, Operation, resolve_link
+from ._graph import (
+    Artefact,
+    get_op_options,
+    get_ops_options,
+    Operation,
+    resolve_link,
+)
 from ._logging import logger
-from ._run import run_op, RunStatus
+from ._run import cached_operations, run_op, RunStatus
 from ._short_hash import shorten_hash
+from .config import Options
+
+# rq queues, reused by every enqueue from this process.
+_queue_key_t = Tuple[str, FrozenSet[Tuple[str, Any]]]
+_queues: dict[_queue_key_t, Queue] = {}
 
 
 def __set_as_hashes(db: Redis[bytes], key1: str, key2: str) -> set[hash_t]:
-    mem = db.sinter(key1, key2)
-    out = set()
-    for k in mem:
-        if isinstance(k, bytes):
-            out.add(hash_t(k.decode()))
-        elif isinstance(k, str):
-            out.add(hash_t(k))
-        else:
-            out.add(hash_t(str(k)))
-    return out
+    # Connections are opened with decode_responses=False, so members are bytes.
+    # hash_t() is a no-op at runtime, so we cast the whole set instead.
+    mem = cast("set[bytes]", db.sinter(key1, key2))
+    return cast("set[hash_t]", set(map(bytes.decode, mem)))
+
+
+# Server-side script that marks an operation as done in a DAG and returns the
+# dependents that are now ready, in a single atomic call.
+#   KEYS[1] DAG operations, KEYS[2] children of op, KEYS[3] DAG status table
+_READY_DEPENDENTS = """
+local ready = {}
+for _, dependent in ipairs(redis.call("SINTER", KEYS[1], KEYS[2])) do
+    if redis.call("HINCRBY", KEYS[3], dependent, -1) == 0 then
+        table.insert(ready, dependent)
+    end
+end
+return ready
+"""
 
 
 def _dag_dependents(db: Redis[bytes], dag_of: hash_t, op_from: hash_t) -> set[hash_t]:
@@ -42,53 +70,56 @@ def _dag_dependents(db: Redis[bytes], dag_of: hash_t, op_from: hash_t) -> set[ha
 
 def delete_all_dags(db: Redis[bytes]) -> None:
     """Delete all currently stored DAGs."""
+    keys = [DAG_INDEX]
     for dag in db.smembers(DAG_INDEX):
-        db.delete(join(DAG_OPERATIONS, dag.decode()))  # type:ignore
-        db.delete(join(DAG_STATUS, dag.decode()))  # type:ignore
-    # Remove old index
-    db.delete(DAG_INDEX)
+        keys.append(join(DAG_OPERATIONS, hash_t(dag.decode())))
+        keys.append(join(DAG_STATUS, hash_t(dag.decode())))
+    # Deleting large DAGs can take a while, so memory is reclaimed in the
+    # background.
+    db.unlink(*keys)
 
 
 def ancestors(
     db: Redis[bytes], *addresses: hash_t, include_subdags: bool = False
 ) -> set[hash_t]:
     """Get all ancestors of a given hash."""
-    queue = list(addresses)
-    out = set()
+    queue = set(addresses)
+    out: set[hash_t] = set()
+    prefix = OPERATIONS + ":"  # hoisted out of the key building loop
 
     while len(queue) > 0:
-        curr = queue.pop()
-        parents = db.smembers(join(OPERATIONS, curr, "parents"))
-
-        if include_subdags:
-            # special case for subdag operations
-            parents = parents.union(
-                db.smembers(join(OPERATIONS, curr, "parents.subdag"))
-            )
-
-        for el in parents:
-            if el == b"root":
-                continue
-
-            h = hash_t(el.decode())
-            out.add(h)
-            if h not in queue:
-                queue.append(h)
+        # Fetch the parents of the whole frontier in a single round-trip.
+        pipe = db.pipeline(transaction=False)
+        for curr in queue:
+            pipe.smembers(f"{prefix}{curr}:parents")
+            if include_subdags:
+                # special case for subdag operations
+                pipe.smembers(f"{prefix}{curr}:parents.subdag")
+
+        parents: set[bytes] = set().union(*pipe.execute())
+        parents.discard(b"root")
+        # Only explore operations we haven't seen yet: diamond-shaped DAGs
+        # would otherwise be walked once per path instead of once per node.
+        queue = cast("set[hash_t]", set(map(bytes.decode, parents))) - out
+        out.update(queue)
     return out
 
 
 def descendants(db: Redis[bytes], *addresses: hash_t) -> set[hash_t]:
     """Get all descendants of a given hash."""
-    queue = list(addresses)
-    out = set()
+    queue = set(addresses)
+    out: set[hash_t] = set()
+    prefix = OPERATIONS + ":"  # hoisted out of the key building loop
 
     while len(queue) > 0:
-        curr = queue.pop()
-        for el in db.smembers(join(OPERATIONS, curr, "children")):
-            h = hash_t(el.decode())
-            out.add(h)
-            if h not in queue:
-                queue.append(h)
+        # Fetch the children of the whole frontier in a single round-trip.
+        pipe = db.pipeline(transaction=False)
+        for curr in queue:
+            pipe.smembers(f"{prefix}{curr}:children")
+
+        children: set[bytes] = set().union(*pipe.execute())
+        queue = cast("set[hash_t]", set(map(bytes.decode, children))) - out
+        out.update(queue)
     return out
 
 
@@ -96,40 +127,65 @@ def get_nearest_operation(
     db: Redis[bytes], address: hash_t, subdag: Optional[str] = None
 ) -> Optional[Operation]:
     """Return the operation at address or the operation generating address."""
-    root = "root"
-    art = None
-    try:
-        node = Operation.grab(db, address)
-        return node
-    except RuntimeError:
-        # one possibility is that address is an artefact...
-        try:
-            art = Artefact[Any].grab(db, address)
-        except RuntimeError:
-            raise RuntimeError(
-                f"address {address} neither a valid operation nor a valid artefact."
-            )
+    pipe = db.pipeline(transaction=False)
+    pipe.exists(join(OPERATIONS, address))
+    pipe.hget(join(ARTEFACTS, address), "parent")
+    is_op, parent = pipe.execute()
+
+    if is_op:
+        return Operation.grab(db, address)
+
+    # one possibility is that address is an artefact...
+    if parent is None:
+        raise RuntimeError(
+            f"address {address} neither a valid operation nor a valid artefact."
+        )
 
-    if art.parent == root:
+    if parent == b"root":
         # We have basically just a single artefact as the network...
         return None
     else:
-        node = Operation.grab(db, art.parent)
-        return node
+        return Operation.grab(db, hash_t(parent.decode()))
 
 
 def build_dag(
     db: Redis[bytes], address: hash_t, subdag: Optional[str] = None
-) -> None:  # noqa:C901
-    """Setup DAG required to compute the result at a specific address."""
+) -> set[hash_t]:  # noqa:C901
+    """Setup DAG required to compute the result at a specific address.
+
+    Operations that are already cached are pruned from the DAG, along with the
+    ancestors that only they depend on. Returns the operations of the DAG that
+    are ready to be executed.
+    """
     node = get_nearest_operation(db, address)
     if node is None:
-        return
+        return set()
 
     # Ok, so now we finally know we have a node, and we want to extract the whole DAG
-    # from it.
-    ancs = ancestors(db, node.hash)
-    logger.debug(f"{node.hash[:6]} has {len(ancs)} ancestors")
+    # from it. We walk up one level at a time, but do not go past cached
+    # operations. The requested node is always part of the DAG, so that its
+    # dependents (or a parent DAG) are enqueued once it is done.
+    parents: dict[hash_t, set[hash_t]] = {node.hash: set()}
+    visited = {node.hash}
+    queue = [] if node.hash in cached_operations(db, [node.hash]) else [node.hash]
+    prefix = OPERATIONS + ":"  # hoisted out of the key building loop
+    while len(queue) > 0:
+        pipe = db.pipeline(transaction=False)
+        for curr in queue:
+            pipe.smembers(f"{prefix}{curr}:parents")
+
+        for curr, members in zip(queue, pipe.execute()):
+            members.discard(b"root")
+            parents[curr] = cast("set[hash_t]", set(map(bytes.decode, members)))
+
+        new = set().union(*[parents[curr] for curr in queue]) - visited
+        visited.update(new)
+        queue = list(new - cached_operations(db, new))
+        for curr in queue:
+            parents[curr] = set()
+
+    # arguments are only formatted if debug messages are enabled
+    logger.debug("{} has {} uncached ancestors", node.hash[:6], len(parents) - 1)
 
     if subdag is None:
         dag_of = address
@@ -139,60 +195,125 @@ def build_dag(
     table = join(DAG_STATUS, dag_of)
     ops = join(DAG_OPERATIONS, dag_of)
 
+    # Only dependencies that are part of the DAG need to be waited on.
+    ndepen = dict((h, len(p.intersection(parents))) for h, p in parents.items())
+
     # Initialize the dependencies count for each DAG operation.
     pipe = db.pipeline(transaction=True)
-    pipe.delete(table)  # get rid of previous status data
-    for address in ancs.union([node.hash]):
-        ndepen = db.scard(join(OPERATIONS, address, "parents"))
-        pipe.hset(table, address, ndepen)
-        pipe.sadd(ops, address)
+    pipe.delete(table, ops)  # get rid of previous DAG data
+    pipe.hset(table, mapping=ndepen)  # type:ignore
+    pipe.sadd(ops, *parents)
 
     pipe.sadd(DAG_INDEX, dag_of)
     pipe.execute()
+    return set(h for h, n in ndepen.items() if n == 0)
 
 
-def enqueue_dependents(
-    dag_of: hash_t,
-    current: hash_t,
-) -> None:
-    """Enqueue dependents."""
-    job = rq.get_current_job()
-    db: Redis[bytes] = job.connection
-    depen = _dag_dependents(db, dag_of, current)
-    logger.info(f"has {len(depen)} dependents")
-
-    dagtable = join(DAG_STATUS, dag_of)
-    for dependent in depen:
-        # First, atomically update dependencies status
-        ndepen = db.hincrby(dagtable, dependent, -1)
+def _queue_key(options: Options) -> _queue_key_t:
+    """Identify the rq queue an operation should be enqueued on."""
+    return (options.queue, frozenset(options.queue_args.items()))
 
-        if ndepen == 0:
-            # Operation is ready to be executed.
-            options = get_op_options(db, dependent)
-            queue = Queue(options.queue, connection=db, **options.queue_args)
 
-            logger.info(f"-> {shorten_hash(dependent)}")
+def _get_queue(db: Redis[bytes], options: Options) -> Queue:
+    """Get the (cached) rq queue an operation should be enqueued on."""
+    key = _queue_key(options)
+    queue = _queues.get(key)
+    if queue is None or queue.connection is not db:
+        queue = Queue(name=options.queue, connection=db, **options.queue_args)
+        _queues[key] = queue
+    return queue
+
+
+def _enqueue_tasks(db: Redis[bytes], dag_of: hash_t, ops: Iterable[hash_t]) -> None:
+    """Enqueue tasks for DAG operations, sending all jobs in one pipeline."""
+    queues: dict[_queue_key_t, Queue] = {}
+    jobs: dict[_queue_key_t, list[EnqueueData]] = {}
+    ops = list(ops)
+    for op, options in zip(ops, get_ops_options(db, ops)):
+        queue = _get_queue(db, options)
+        if not queue.is_async:
+            # Synchronous queues run the job right away, nothing to batch.
             queue.enqueue_call(
                 "funsies._dag.task",
-                args=(dag_of, dependent),
+                args=(dag_of, op),
                 kwargs=options.task_args,
                 **options.job_args,
             )
+            continue
 
-    # We may want to execute a subdag dependent
-    components = dag_of.split("/")
-    if len(components) > 1:
-        evaluating = components[-1]
-        from_op = components[-2]
-        in_parent_dag = components[:-2]
-        if current == evaluating:
-            logger.info("done evaluating subdag")
-            logger.info(f"enqueuing dependents of {shorten_hash(hash_t(from_op))}")
-            logger.info(
-                "within dag of"
-                + f' {"/".join([shorten_hash(hash_t(el)) for el in in_parent_dag])}'
+        key = _queue_key(options)
+        queues[key] = queue
+        jobs.setdefault(key, []).append(
+            Queue.prepare_data(
+                "funsies._dag.task",
+                args=(dag_of, op),
+                kwargs=options.task_args,
+                **options.job_args,
             )
-            enqueue_dependents(hash_t("/".join(in_parent_dag)), hash_t(from_op))
+        )
+
+    if jobs:
+        pipe = db.pipeline()
+        for key, data in jobs.items():
+            queues[key].enqueue_many(data, pipeline=pipe)
+        pipe.execute()
+
+
+def enqueue_dependents(
+    dag_of: hash_t,
+    current: hash_t,
+) -> None:
+    """Enqueue dependents."""
+    job = rq.get_current_job()
+    db: Redis[bytes] = job.connection
+    script = db.register_script(_READY_DEPENDENTS)
+
+    # Operations whose dependents still need to be processed. Cached
+    # dependents and finished subdags are pushed back here rather than
+    # recursed into, so that long cached chains don't blow up the stack.
+    worklist = deque([(dag_of, current)])
+    while worklist:
+        dag_of, current = worklist.popleft()
+        members = script(
+            keys=[
+                join(DAG_OPERATIONS, dag_of),
+                join(OPERATIONS, current, "children"),
+                join(DAG_STATUS, dag_of),
+            ]
+        )
+        ready = cast("list[hash_t]", list(map(bytes.decode, members)))
+        logger.info("has {} dependents ready", len(ready))
+        for dependent in ready:
+            logger.info("-> {}", shorten_hash(dependent))
+
+        # Dependents may have been computed in the meantime (by another DAG
+        # for example.) Those have nothing left to run, so we go straight to
+        # their own dependents instead of enqueuing a job that would only do
+        # the same.
+        cached = cached_operations(db, ready)
+        _enqueue_tasks(
+            db, dag_of, [dependent for dependent in ready if dependent not in cached]
+        )
+        for dependent in cached:
+            logger.info("{} is cached, skipping", shorten_hash(dependent))
+            worklist.append((dag_of, dependent))
+
+        # We may want to execute a subdag dependent
+        components = dag_of.split("/")
+        if len(components) > 1:
+            evaluating = components[-1]
+            from_op = components[-2]
+            in_parent_dag = components[:-2]
+            if current == evaluating:
+                logger.info("done evaluating subdag")
+                logger.info("enqueuing dependents of {}", shorten_hash(hash_t(from_op)))
+                logger.opt(lazy=True).info(
+                    "within dag of {}",
+                    lambda: "/".join(
+                        [shorten_hash(hash_t(el)) for el in in_parent_dag]
+                    ),
+                )
+                worklist.append((hash_t("/".join(in_parent_dag)), hash_t(from_op)))
 
 
 def acquire_task(db: Redis[bytes], op_hash: hash_t, worker_name: Optional[str]) -> bool:
@@ -214,7 +335,7 @@ def acquire_task(db: Redis[bytes], op_hash: hash_t, worker_name: Optional[str])
             return False
 
         holder = key.decode()
-        logger.info(f"job currently held by {holder}")
+        logger.info("job currently held by {}", holder)
         if holder == worker_name:
             logger.error("other worker is myself! HOW!?")
             return True
@@ -256,7 +377,7 @@ def task(
     job = rq.get_current_job()
     db: Redis[bytes] = job.connection
     worker_name: Optional[str] = job.worker_name
-    logger.debug(f"attempting {current} on {worker_name}.")
+    logger.debug("attempting {} on {}.", current, worker_name)
 
     # TODO: Fix
     store = get_storage(None)
@@ -269,8 +390,7 @@ def task(
             # Do job later
             time.sleep(0.5)  # delay so as to not hit the db too often
             options = get_op_options(db, current)
-            queue = Queue(name=options.queue, connection=db, **options.queue_args)
-            queue.enqueue_call(
+            _get_queue(db, options).enqueue_call(
                 "funsies._dag.task",
                 args=(dag_of, current),
                 kwargs=options.task_args,
@@ -288,7 +408,7 @@ def task(
                 for value in op.out.values():
                     ln = resolve_link(db, value)
                     art = Artefact[Any].grab(db, ln)
-                    logger.info(f"starting subdag -> {shorten_hash(art.parent)}")
+                    logger.info("starting subdag -> {}", shorten_hash(art.parent))
                     start_dag_execution(db, art.parent, subdag=f"{dag_of}/{current}")
 
             if stat > 0:
@@ -305,20 +425,70 @@ def start_dag_execution(
 ) -> None:
     """Execute a DAG to obtain a given output using an RQ queue."""
     # make dag
-    build_dag(db, data_output, subdag)
+    ready = build_dag(db, data_output, subdag)
 
     if subdag is not None:
         dag_of = hash_t(f"{subdag}/{data_output}")
     else:
         dag_of = data_output
 
-    # enqueue everything starting from root
-    for element in _dag_dependents(db, dag_of, hash_t("root")):
-        options = get_op_options(db, element)
-        queue = Queue(name=options.queue, connection=db, **options.queue_args)
-        queue.enqueue_call(
-            "funsies._dag.task",
-            args=(dag_of, element),
-            kwargs=options.task_args,
-            **options.job_args,
+    # enqueue everything that has no dependencies left
+    _enqueue_tasks(db, dag_of, ready)
+
+
+def build_dag_task(data_output: hash_t) -> None:
+    """Worker-side construction and execution of a DAG."""
+    job = rq.get_current_job()
+    db: Redis[bytes] = job.connection
+    start_dag_execution(db, data_output)
+
+
+# DAG builds never time out and use the default ttls
+_build_job_args = Options().job_args
+
+
+def submit_dag_execution(db: Redis[bytes], *data_outputs: hash_t) -> None:
+    """Execute DAGs, building them on workers if the workflow is distributed."""
+    queues: dict[_queue_key_t, Queue] = {}
+    jobs: dict[_queue_key_t, list[EnqueueData]] = {}
+    for data_output in data_outputs:
+        node = get_nearest_operation(db, data_output)
+        if node is None:
+            # a lone artefact, there is nothing to execute
+            continue
+
+        if cached_operations(db, [node.hash]):
+            logger.info("{} is cached, nothing to execute", shorten_hash(node.hash))
+            continue
+
+        if node.options is None or len(node.inp) == 0:
+            # Nothing to walk, might as well do it right here.
+            start_dag_execution(db, data_output)
+            continue
+
+        queue = _get_queue(db, node.options)
+        if not queue.is_async:
+            start_dag_execution(db, data_output)
+            continue
+
+        # Building large DAGs takes a while, so we let a worker do it instead
+        # of blocking the caller.
+        # The operation's timeout and ttls are for running it, not for
+        # building its DAG, so only the queue is taken from its options.
+        key = _queue_key(node.options)
+        queues[key] = queue
+        jobs.setdefault(key, []).append(
+            Queue.prepare_data(
+                "funsies._dag.build_dag_task",
+                args=(data_output,),
+                at_front=True,
+                **_build_job_args,
+            )
         )
+
+    # Submit all the DAG builds at once.
+    if jobs:
+        pipe = db.pipeline()
+        for key, data in jobs.items():
+            queues[key].enqueue_many(data, pipeline=pipe)
+        pipe.execute()
@@ -4,6 +4,9 @@ from __future__ import annotations
 # std
 from typing import Union
 
+# external
+from redis.client import Pipeline
+
 # module
 from . import _constants as c
 from ._context import Connection, get_connection
@@ -36,19 +39,30 @@ def get(
     db, store = get_connection(connection)
     hashes = hash_load(db, target)
     out: list[Union[Artefact, Funsie, Operation]] = []
+
+    # probe all the hashes at once
+    pipe: Pipeline = db.pipeline(transaction=False)
     for h in hashes:
-        if db.exists(c.join(c.ARTEFACTS, h)):
-            logger.debug(f"{h} is Artefact")
+        pipe.exists(c.join(c.ARTEFACTS, h))
+        pipe.exists(c.join(c.FUNSIES, h))
+        pipe.exists(c.join(c.OPERATIONS, h))
+    flags = pipe.execute()
+
+    for h, is_artefact, is_funsie, is_operation in zip(
+        hashes, flags[0::3], flags[1::3], flags[2::3]
+    ):
+        if is_artefact:
+            logger.debug("{} is Artefact", h)
             out += [Artefact.grab(db, h)]
 
-        elif db.exists(c.join(c.FUNSIES, h)):
-            logger.debug(f"{h} is Funsie")
+        elif is_funsie:
+            logger.debug("{} is Funsie", h)
             out += [Funsie.grab(db, h)]
 
-        elif db.exists(c.join(c.OPERATIONS, h)):
-            logger.debug(f"{h} is Operation")
+        elif is_operation:
+            logger.debug("{} is Operation", h)
             out += [Operation.grab(db, h)]
 
         else:
-            logger.debug(f"{h} does not exist")
+            logger.debug("{} does not exist", h)
     return out
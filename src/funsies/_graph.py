@@ -6,7 +6,7 @@ from dataclasses import dataclass
 from enum import IntEnum
 import hashlib
 import io
-from typing import Any, Generic, Mapping, Optional, Type, TypeVar
+from typing import Any, Generic, Iterable, Mapping, Optional, Sequence, Type, TypeVar
 
 # external
 from redis import Redis
@@ -107,6 +107,28 @@ class Artefact(Generic[T]):
             kind=Encoding(data[b"kind"].decode()),
         )
 
+    @classmethod
+    def grab_many(
+        cls: Type[Artefact[T]], db: Redis[bytes], hashes: Sequence[hash_t]
+    ) -> list[Artefact[T]]:
+        """Grab many artefacts from the Redis store in one round-trip."""
+        pipe: Pipeline = db.pipeline(transaction=False)
+        for h in hashes:
+            pipe.hgetall(join(ARTEFACTS, h))
+
+        out = []
+        for h, data in zip(hashes, pipe.execute()):
+            if not data:
+                raise RuntimeError(f"No artefact at {h}")
+            out.append(
+                Artefact[T](
+                    hash=hash_t(data[b"hash"].decode()),
+                    parent=hash_t(data[b"parent"].decode()),
+                    kind=Encoding(data[b"kind"].decode()),
+                )
+            )
+        return out
+
 
 def is_artefact(db: Redis[bytes], address: hash_t) -> bool:
     """Check whether a hash corresponds to an artefact."""
@@ -295,11 +317,8 @@ def set_data(
     set_stream(db, store, address, buf, status)
 
 
-# not pipeline-able (because of set_data)
-def constant_artefact(
-    db: Redis[bytes], store: StorageEngine, value: Tdata
-) -> Artefact[Tdata]:
-    """Db an artefact with a defined value."""
+def _constant_node(value: Tdata) -> tuple[Artefact[Tdata], bytes]:
+    """Hash a constant value and return its artefact and encoded data."""
     kind = _serdes.kind(value)
     data = _serdes.encode(kind, value)
     if isinstance(data, Error):
@@ -317,14 +336,37 @@ def constant_artefact(
     m.update(data)
     h = hash_t(m.hexdigest())
     # ==============================================================
-    node = Artefact[Tdata](hash=h, parent=hash_t("root"), kind=kind)
+    return Artefact[Tdata](hash=h, parent=hash_t("root"), kind=kind), data
+
+
+# not pipeline-able (because of set_data)
+def constant_artefact(
+    db: Redis[bytes], store: StorageEngine, value: Tdata
+) -> Artefact[Tdata]:
+    """Db an artefact with a defined value."""
+    node, data = _constant_node(value)
     pipe: Pipeline = db.pipeline(transaction=False)
     node.put(pipe)
     pipe.execute()
-    set_data(db, store, h, data, status=ArtefactStatus.const)
+    set_data(db, store, node.hash, data, status=ArtefactStatus.const)
     return node
 
 
+def constant_artefacts(
+    db: Redis[bytes], store: StorageEngine, values: Iterable[Tdata]
+) -> list[Artefact[Tdata]]:
+    """Db many artefacts with defined values, saving them all at once."""
+    nodes = [_constant_node(value) for value in values]
+    pipe: Pipeline = db.pipeline(transaction=False)
+    for node, _ in nodes:
+        node.put(pipe)
+    pipe.execute()
+
+    for node, data in nodes:
+        set_data(db, store, node.hash, data, status=ArtefactStatus.const)
+    return [node for node, _ in nodes]
+
+
 # pipeline-able
 def variable_artefact(
     store: Redis[bytes],
@@ -385,16 +427,50 @@ class Operation:
     @classmethod
     def grab(cls: Type["Operation"], db: Redis[bytes], hash: hash_t) -> "Operation":
         """Grab an operation from the Redis store."""
-        if not db.exists(join(OPERATIONS, hash)):
-            raise RuntimeError(f"No operation at {hash}")
-
         pipe: Pipeline = db.pipeline(transaction=False)
+        pipe.exists(join(OPERATIONS, hash))
         pipe.hgetall(join(OPERATIONS, hash))
         pipe.hgetall(join(OPERATIONS, hash, "inp"))
         pipe.hgetall(join(OPERATIONS, hash, "out"))
         pipe.get(join(OPERATIONS, hash, "options"))
-        metadata, inp, out, tmp = pipe.execute()
+        exists, metadata, inp, out, tmp = pipe.execute()
+
+        if not exists:
+            raise RuntimeError(f"No operation at {hash}")
+
+        return cls._from_fields(metadata, inp, out, tmp)
+
+    @classmethod
+    def grab_many(
+        cls: Type["Operation"], db: Redis[bytes], hashes: Sequence[hash_t]
+    ) -> list["Operation"]:
+        """Grab many operations from the Redis store in one round-trip."""
+        pipe: Pipeline = db.pipeline(transaction=False)
+        for h in hashes:
+            pipe.hgetall(join(OPERATIONS, h))
+            pipe.hgetall(join(OPERATIONS, h, "inp"))
+            pipe.hgetall(join(OPERATIONS, h, "out"))
+            pipe.get(join(OPERATIONS, h, "options"))
+        raw = pipe.execute()
+
+        ops = []
+        for h, metadata, inp, out, tmp in zip(
+            hashes, raw[0::4], raw[1::4], raw[2::4], raw[3::4]
+        ):
+            if not metadata:
+                raise RuntimeError(f"No operation at {h}")
+            ops.append(cls._from_fields(metadata, inp, out, tmp))
+        return ops
 
+    @classmethod
+    def _from_fields(
+        cls: Type["Operation"],
+        metadata: dict[bytes, bytes],
+        inp: dict[bytes, bytes],
+        out: dict[bytes, bytes],
+        tmp: Optional[bytes],
+    ) -> "Operation":
+        """Build an operation from its raw redis data."""
         if tmp is not None:
             options: Optional[Options] = Options.unpack(tmp.decode())
         else:
@@ -490,3 +566,21 @@ def get_op_options(store: Redis[bytes], hash: hash_t) -> Options:
     if out is None:
         raise RuntimeError(f"Options for operation at {hash} could not be found.")
     return Options.unpack(out.decode())
+
+
+def get_ops_options(store: Redis[bytes], hashes: Sequence[hash_t]) -> list[Options]:
+    """Load options of many operations from Redis store in one round-trip."""
+    if not hashes:
+        return []
+
+    out = []
+    unpacked: dict[bytes, Options] = {}  # operations mostly share their options
+    for h, packed in zip(
+        hashes, store.mget([join(OPERATIONS, h, "options") for h in hashes])
+    ):
+        if packed is None:
+            raise RuntimeError(f"Options for operation at {h} could not be found.")
+        if packed not in unpacked:
+            unpacked[packed] = Options.unpack(packed.decode())
+        out.append(unpacked[packed])
+    return out
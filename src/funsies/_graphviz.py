@@ -8,6 +8,7 @@ from typing import Dict, Optional
 
 # external
 from redis import Redis
+from redis.client import Pipeline
 
 # module
 from ._constants import ARTEFACTS, FUNSIES, hash_t, join
@@ -27,18 +28,16 @@ __link_type = Dict[hash_t, hash_t]
 # chuck it.
 
 
+# characters that need to be escaped in record labels
+__escape_table = str.maketrans(
+    {"<": r"\<", ">": r"\>", "|": r"\|", "{": r"\{", "}": r"\}", '"': r"\""}
+)
+
+
 def __sanitize_command(lab: str) -> str:
     if ".<locals>" in lab:
         lab = lab.split(".<locals>")[0]
-    return (
-        lab.replace("<", r"\<")
-        .replace(">", r"\>")
-        .replace("|", r"\|")
-        .replace("{", r"\{")
-        .replace("}", r"\}")
-        .replace('"', r"\"")
-        .replace("&&", r"\n")
-    )
+    return lab.translate(__escape_table).replace("&&", r"\n")
 
 
 def export(
@@ -47,9 +46,8 @@ def export(
     """Output a DAG in dot format for graphviz."""
     nodes: __node_type = {}
     labels: dict[str, str] = {}
-    artefacts: __artefact_type = {}
 
-    funsies = {}
+    funsies: dict[hash_t, dict[bytes, bytes]] = {}
     art_hashes = set()
 
     for address in addresses:
@@ -61,16 +59,19 @@ def export(
         curr_nodes.add(node.hash)
         logger.info(f"graph contains {len(curr_nodes)} nodes")
 
-        for k, h in enumerate(curr_nodes):
-            if k % 100 == 0 and k > 0:
-                logger.info(f"done: {k} / {len(curr_nodes)}")
-            # all the operations
-            nodes[h] = {}
-            obj = Operation.grab(db, h)
+        # all the operations, fetched in one go
+        ops = Operation.grab_many(db, list(curr_nodes))
 
-            # get funsies data, cache it too
-            if obj.funsie not in funsies:
-                funsies[obj.funsie] = db.hgetall(join(FUNSIES, obj.funsie))
+        # get funsies data, cache it too
+        missing = list(set(obj.funsie for obj in ops) - funsies.keys())
+        pipe: Pipeline = db.pipeline(transaction=False)
+        for f in missing:
+            pipe.hgetall(join(FUNSIES, f))
+        funsies.update(zip(missing, pipe.execute()))
+
+        for obj in ops:
+            h = obj.hash
+            nodes[h] = {}
             funsie = funsies[obj.funsie]
 
             labels[h] = __sanitize_command(funsie[b"what"].decode())
@@ -88,11 +89,10 @@ def export(
     artefact_hashes = list(art_hashes)
     redis_keys = [join(ARTEFACTS, address, "status") for address in artefact_hashes]
     statuses: list[Optional[bytes]] = db.mget(redis_keys)
-    for h, s in zip(artefact_hashes, statuses):
-        if s is None:
-            artefacts[h] = ArtefactStatus.not_found
-        else:
-            artefacts[h] = ArtefactStatus(int(s.decode()))
+    artefacts: __artefact_type = dict(
+        (h, ArtefactStatus.not_found if s is None else ArtefactStatus(int(s)))
+        for h, s in zip(artefact_hashes, statuses)
+    )
 
     # Get links
     links: dict[hash_t, hash_t] = {}
@@ -159,49 +159,54 @@ def format_dot(  # noqa:C901
     keep: dict[hash_t, list[hash_t]] = {}
     finals: dict[hash_t, hash_t] = {}
     initials: dict[hash_t, list[hash_t]] = {}
+    target_set = set(targets)
     # Setup which artefacts to show, which are inputs and which are outputs.
-    for n in nodes:
-        for v in nodes[n]["inputs"].values():
+    for n, node in nodes.items():
+        inp, out = node["inputs"], node["outputs"]
+        for v in inp.values():
             # todo make conditional keep setable
             if artefacts[v] == 2:
-                initials[v] = initials.get(v, []) + [n]
+                initials.setdefault(v, []).append(n)
                 if show_inputs:
-                    keep[v] = keep.get(v, []) + [n]
+                    keep.setdefault(v, []).append(n)
             else:
-                keep[v] = keep.get(v, []) + [n]
+                keep.setdefault(v, []).append(n)
 
         # if targets are artefacts, then we should always keep them
-        for t in targets:
-            if t in nodes[n]["outputs"].values():
-                keep[t] = []
-                finals[t] = n
+        for v in out.values():
+            if v in target_set:
+                keep[v] = []
+                finals[v] = n
 
         # if targets are nodes, then we should always keep all the artefacts.
-        if n in targets:
-            for v in nodes[n]["outputs"].values():
-                keep[v] = keep.get(v, []) + [n]
+        if n in target_set:
+            for v in out.values():
+                keep.setdefault(v, []).append(n)
                 finals[v] = n
 
     # keep all the links too
     for k, v in links.items():
-        keep[v] = keep.get(v, []) + [k]
+        keep.setdefault(v, []).append(k)
 
     # write operation nodes
-    nstring = ""
-    for n in nodes:
-        inps = []
-        for kk, v in nodes[n]["inputs"].items():
-            if v in keep:
-                inps += [f"<A{v}>{__sanitize_fn(kk)}"]
-        inps = "|".join(inps)
-
-        outs = []
-        for kk, v in nodes[n]["outputs"].items():
-            if v in keep:
-                outs += [f"<A{v}>{__sanitize_fn(kk)}"]
-        outs = "|".join(outs)
+    nparts: list[str] = []
+    for n, node in nodes.items():
+        inps = "|".join(
+            [
+                f"<A{v}>{__sanitize_fn(kk)}"
+                for kk, v in node["inputs"].items()
+                if v in keep
+            ]
+        )
+        outs = "|".join(
+            [
+                f"<A{v}>{__sanitize_fn(kk)}"
+                for kk, v in node["outputs"].items()
+                if v in keep
+            ]
+        )
 
-        nstring += (
+        nparts.append(
             f"N{n} ["
             + "shape=record,width=.1,height=.1,"
             + 'label="'
@@ -217,34 +222,32 @@ def format_dot(  # noqa:C901
 
     # write artefact nodes
     for k in set(keep):
-        nstring += (
+        nparts.append(
             f"A{k}"
             + f'[shape=box,label="{shorten_hash(k)}"'
             + f",{__style_node(artefacts[k])}];\n"
         )
 
     # Make connections
-    connect = ""
-    for n in nodes:
-        for _, v in nodes[n]["outputs"].items():
+    cparts: list[str] = []
+    for n, node in nodes.items():
+        for v in node["outputs"].values():
             if v in keep:
-                connect += f"N{n}:A{v} -> A{v} [{__style_line(artefacts[v])}];\n"
+                cparts.append(f"N{n}:A{v} -> A{v} [{__style_line(artefacts[v])}];\n")
 
-        for _, v in nodes[n]["inputs"].items():
+        for v in node["inputs"].values():
             if v in keep:
-                connect += f"A{v} -> N{n}:A{v} [{__style_line(artefacts[v])}];\n"
+                cparts.append(f"A{v} -> N{n}:A{v} [{__style_line(artefacts[v])}];\n")
 
-    ranks = ""
+    ranks: list[str] = []
     for k, v in links.items():
-        connect += f"A{v} -> A{k} [{__style_line_link}];\n"
-        ranks += "{" + f"rank = same; A{v}; A{k};" + "}\n"
+        cparts.append(f"A{v} -> A{k} [{__style_line_link}];\n")
+        ranks.append("{" + f"rank = same; A{v}; A{k};" + "}\n")
 
     if show_inputs:
-        init = []
-        for a in initials:
-            init += [f"A{a}"]
+        init = [f"A{a}" for a in initials]
         if len(init):
-            ranks += "{rank = same;" + ";".join(init) + ";}\n"
+            ranks.append("{rank = same;" + ";".join(init) + ";}\n")
 
     # rank_last = []
     # for t in finals.keys():
@@ -252,4 +255,4 @@ def format_dot(  # noqa:C901
     # ranks += "{rank = same;" + ";".join(rank_last) + ";}\n"
 
     footer = "\n}"
-    return header + nstring + connect + ranks + footer
+    return "".join([header, *nparts, *cparts, *ranks, footer])
@@ -9,34 +9,35 @@ import loguru
 logger = loguru.logger
 logger.remove()
 
+# Standard format for errors etc
+log_format = (
+    "<green>{time:YYYYMMDD} {time:HH:mm:ss.S}</green>|"
+    + " <level>{level: <8}</level> |"
+    + " <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan>"
+    + " <level>{message}</level>"
+    + "\n{exception}"
+)
+
+# Error format for operations
+worker_format = (
+    " op:<green>{extra[op]}</green> |" + " <level>{message}</level>" + "\n{exception}"
+)
+
+
+def _format(record: "loguru.Record") -> str:
+    """Pick the format of a log record, so that a single sink is needed."""
+    if "op" in record["extra"]:
+        return worker_format
+    else:
+        return log_format
+
 
-# Standard logger for errors etc
 def set_level(level: str) -> None:
     """Set logging level."""
-    log_format = (
-        "<green>{time:YYYYMMDD} {time:HH:mm:ss.S}</green>|"
-        + " <level>{level: <8}</level> |"
-        + " <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan>"
-        + " <level>{message}</level>"
-    )
     logger.remove()
-    logger.add(
-        sys.stderr,
-        format=log_format,
-        level=level,
-        filter=lambda record: "op" not in record["extra"],
-    )
+    # No extended backtraces, as was the case for operation logs
+    logger.add(sys.stderr, format=_format, level=level, backtrace=False)
 
 
 # Default level
 set_level("INFO")
-
-# Error logger for operations
-worker_format = " op:<green>{extra[op]}</green> |" + " <level>{message}</level>"
-logger.add(
-    sys.stderr,
-    format=worker_format,
-    filter=lambda record: "op" in record["extra"],
-    level="INFO",
-    backtrace=False,
-)
@@ -2,9 +2,10 @@
 from __future__ import annotations
 
 # std
+from collections import deque
 from dataclasses import dataclass
 import hashlib
-from typing import cast, Optional, Set, Type
+from typing import Optional, Type
 
 # external
 from redis import Redis
@@ -34,17 +35,15 @@ def _parametrize_subgraph(
     # then we grab all the descendants for all the inputs.
     input_ops = set()
     for name, inp in inputs.items():
-        inp_dependent_ops = []
-        for dependent in db.smembers(join(ARTEFACTS, inp.hash, "dependents")):
-            d: str = dependent.decode()
-            if d in out_ancestors:
-                inp_dependent_ops += [d]
+        dependents = db.smembers(join(ARTEFACTS, inp.hash, "dependents"))
+        inp_dependent_ops = out_ancestors.intersection(
+            hash_t(el.decode()) for el in dependents
+        )
 
         if len(inp_dependent_ops) == 0:
             logger.error(f"parametrized input {name} does not change any outputs!")
 
         input_ops.update(inp_dependent_ops)
-    input_ops = cast(Set[hash_t], input_ops)
     in_descendants = descendants(db, *input_ops).union(input_ops)
 
     # The intersection between these two sets forms the set of operators that
@@ -56,11 +55,15 @@ def _subgraph_edges(db: Redis[bytes], nodes: set[hash_t]) -> dict[hash_t, set[ha
     """Compute edges on a connected subgraph."""
     # get edges
     edges: dict[hash_t, set[hash_t]] = {}
+    pipe: Pipeline = db.pipeline(transaction=False)
     for n in nodes:
-        for value in db.smembers(join(OPERATIONS, n, "parents")):
-            parent: hash_t = hash_t(value.decode())
+        pipe.smembers(join(OPERATIONS, n, "parents"))
+
+    for n, parents in zip(nodes, pipe.execute()):
+        for value in parents:
+            parent = hash_t(value.decode())
             if parent in nodes:
-                edges[parent] = edges.get(parent, set()).union([n])
+                edges.setdefault(parent, set()).add(n)
     return edges
 
 
@@ -70,24 +73,21 @@ def _subgraph_toposort(
     """Sort a connected subgraph topologically."""
     # from https://en.wikipedia.org/wiki/Topological_sorting#Kahn's_algorithm
 
-    # remove all the nodes that have dependencies to get the initial set
-    S = nodes.copy()
+    # count dependencies of every node, nodes without any are ready to go
+    indegree = dict((n, 0) for n in nodes)
     for out in edges.values():
         for k in out:
-            S.discard(k)
+            indegree[k] += 1
+    ready = deque(n for n, count in indegree.items() if count == 0)
 
     output = []
-    while len(S):
-        node_n = S.pop()
+    while len(ready):
+        node_n = ready.popleft()
         output.append(node_n)
-        edge_set = edges.pop(node_n, set())
-
-        # keep only the nodes with no dependencies
-        for out in edges.values():
-            for k in out:
-                edge_set.discard(k)
-
-        S = S.union(edge_set)
+        for k in edges.get(node_n, set()):
+            indegree[k] -= 1
+            if indegree[k] == 0:
+                ready.append(k)
     return output
 
 
@@ -8,7 +8,7 @@ from io import BytesIO
 import signal
 import traceback
 from types import FrameType
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Iterable, Optional, Union
 
 # external
 from redis import Redis
@@ -120,6 +120,32 @@ def is_it_cached(db: Redis[bytes], op: Operation) -> bool:
     return answer
 
 
+def cached_operations(db: Redis[bytes], ops: Iterable[hash_t]) -> set[hash_t]:
+    """Find which operations are fully cached, in two round-trips.
+
+    This is the same check as `is_it_cached()`, batched over many operations
+    but without a transaction.
+    """
+    ops = list(ops)
+    pipe = db.pipeline(transaction=False)
+    for op in ops:
+        pipe.hvals(join(OPERATIONS, op, "out"))
+    outputs: list[list[bytes]] = pipe.execute()
+
+    for out in outputs:
+        for address in out:
+            pipe.get(join(ARTEFACTS, hash_t(address.decode()), "status"))
+    statuses = iter(pipe.execute())
+
+    cached = set()
+    for op, out in zip(ops, outputs):
+        # consume statuses for every op, even after a miss
+        stats = [next(statuses) for _ in out]
+        if all(s is not None and int(s) > ArtefactStatus.no_data for s in stats):
+            cached.add(op)
+    return cached
+
+
 def dependencies_are_met(db: Redis[bytes], op: Operation) -> bool:
     """Check if all the dependencies of an operation are met."""
     for val in op.inp.values():
@@ -170,8 +196,7 @@ def run_op(  # noqa:C901
     # load input files
     input_data: dict[str, Result[BytesIO]] = {}
     for key, val in op.inp.items():
-        artefact = Artefact[Any].grab(db, val)
-        dat = get_stream(db, store, artefact.hash, carry_error=op.hash)
+        dat = get_stream(db, store, val, carry_error=op.hash)
         if isinstance(dat, Error):
             if funsie.error_tolerant:
                 logger.warning(f"error on input {key} (tolerated).")
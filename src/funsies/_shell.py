@@ -2,14 +2,16 @@
 from __future__ import annotations
 
 # std
+import io
 from io import BytesIO
 import json
 import os
 import shutil
 import subprocess
+import sys
 import tempfile
 import time
-from typing import Any, Mapping, Optional, Sequence
+from typing import Any, IO, Mapping, Optional, Sequence
 
 # external
 from redis import Redis
@@ -62,6 +64,42 @@ def shell_funsie(
     )
 
 
+# Copying between regular files with sendfile() is only supported on linux
+_IS_LINUX = sys.platform.startswith("linux")
+
+
+def _write_input(val: IO[bytes], path: str) -> None:
+    """Write an input stream to a file, avoiding userspace copies if possible."""
+    with open(path, "wb") as f:
+        if isinstance(val, BytesIO):
+            # data is already in memory, write it out in one go
+            with val.getbuffer() as buf:
+                f.write(buf)
+            return
+
+        try:
+            infd = val.fileno()
+        except (AttributeError, io.UnsupportedOperation):
+            infd = None
+
+        if infd is not None and _IS_LINUX and hasattr(os, "sendfile"):
+            # file to file copy in kernel space
+            start = offset = val.tell()
+            try:
+                while True:
+                    sent = os.sendfile(f.fileno(), infd, offset, 2**30)
+                    if sent == 0:
+                        return
+                    offset += sent
+            except OSError:
+                # not supported for these files, start over the slow way
+                f.seek(0)
+                f.truncate()
+                val.seek(start)
+
+        shutil.copyfileobj(val, f)
+
+
 def run_shell_funsie(  # noqa:C901
     funsie: Funsie, input_values: Mapping[str, Result[BytesIO]]
 ) -> dict[str, Optional[_Data]]:
@@ -73,11 +111,10 @@ def run_shell_funsie(  # noqa:C901
             if isinstance(val, Error):
                 pass
             else:
-                with open(os.path.join(dir, fn), "wb") as f:
-                    shutil.copyfileobj(val, f)
+                _write_input(val, os.path.join(dir, fn))
 
-        cmds = json.loads(funsie.extra["cmds"].decode())
-        new_env = json.loads(funsie.extra["env"].decode())
+        cmds = json.loads(funsie.extra["cmds"])
+        new_env = json.loads(funsie.extra["env"])
         env: Optional[dict[str, str]] = None
         if new_env:
             env = os.environ.copy()
@@ -132,26 +169,30 @@ class ShellOutput:
         self.op = op
         self.hash = op.hash
 
+        # all the artefacts are fetched in a single round-trip
+        ninp = len(op.inp)
+        artefacts = Artefact[Any].grab_many(store, [*op.inp.values(), *op.out.values()])
+        inp = dict(zip(op.inp, artefacts[:ninp]))
+        out = dict(zip(op.out, artefacts[ninp:]))
+
         self.out = {}
         self.n = 0
-        for key, val in op.out.items():
+        for key, val in out.items():
             if SPECIAL in key:
                 if RETURNCODE in key:
                     self.n += 1  # count the number of commands
             else:
-                self.out[key] = Artefact[bytes].grab(store, val)
+                self.out[key] = val
 
-        self.inp = {}
-        for key, val in op.inp.items():
-            self.inp[key] = Artefact[Any].grab(store, val)
+        self.inp = inp
 
         self.stdouts = []
         self.stderrs = []
         self.returncodes = []
         for i in range(self.n):
-            self.stdouts += [Artefact[bytes].grab(store, op.out[f"{STDOUT}{i}"])]
-            self.stderrs += [Artefact[bytes].grab(store, op.out[f"{STDERR}{i}"])]
-            self.returncodes += [Artefact[int].grab(store, op.out[f"{RETURNCODE}{i}"])]
+            self.stdouts += [out[f"{STDOUT}{i}"]]
+            self.stderrs += [out[f"{STDERR}{i}"]]
+            self.returncodes += [out[f"{RETURNCODE}{i}"]]
 
     def __check_len(self: "ShellOutput") -> None:
         if self.n > 1:
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 # std
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass, field, fields
 import json
 import os
 import sys
@@ -10,7 +10,7 @@ from typing import Any, Mapping, Optional, Type
 
 # external
 # redis
-from redis import Redis
+from redis import ConnectionPool, Redis
 
 # module
 from ._logging import logger
@@ -21,12 +21,19 @@ INFINITE = -1
 ONE_DAY = 86400
 ONE_MINUTE = 60
 
+# Connection pools, shared by all the connections to a given server.
+_pools: dict[str, ConnectionPool] = {}
+
 
 def _redis_connection(url: str, try_fail: bool = True) -> Redis[bytes]:
     """Open a new redis connection."""
     hn = _extract_hostname(url)
     logger.info(f"connecting to {hn}")
-    db = Redis.from_url(url, decode_responses=False)
+    pool = _pools.get(url)
+    if pool is None:
+        pool = ConnectionPool.from_url(url, decode_responses=False)
+        _pools[url] = pool
+    db = Redis(connection_pool=pool)
     try:
         db.ping()
     except Exception as e:
@@ -41,6 +48,13 @@ def _redis_connection(url: str, try_fail: bool = True) -> Redis[bytes]:
     return db
 
 
+def _close_pool(url: str) -> None:
+    """Disconnect and forget the connection pool to a given server."""
+    pool = _pools.pop(url, None)
+    if pool is not None:
+        pool.disconnect()
+
+
 # --------------------------------------------------------------------------
 # Redis configuration
 # --------------------------------------------------------------------------
@@ -157,7 +171,7 @@ class MockServer(Server):
 # --------------------------------------------------------------------------
 # Job configuration
 # --------------------------------------------------------------------------
-@dataclass
+@dataclass(frozen=True)
 class Options:
     """Runtime options for an Operation.
 
@@ -209,6 +223,9 @@ class Options:
     # TODO: make meaningfully adjustable
     serializer: str = "rq.serializers.JSONSerializer"
 
+    # Packed form of the options above, computed once in __post_init__.
+    _packed: str = field(init=False, repr=False, compare=False)
+
     @property
     def job_args(self: "Options") -> Mapping[str, Any]:
         """Return a dictionary of arguments for rq.enqueue's job_args."""
@@ -231,9 +248,16 @@ class Options:
         """Return a dictionary of arguments for rq.Queue."""
         return dict(is_async=self.distributed, serializer=self.serializer)
 
+    def __post_init__(self: "Options") -> None:
+        """Pack options once, as instances are immutable."""
+        packed = json.dumps(
+            dict((f.name, getattr(self, f.name)) for f in fields(self) if f.init)
+        )
+        object.__setattr__(self, "_packed", packed)
+
     def pack(self: "Options") -> str:
         """Pack an Options instance to a bytestring."""
-        return json.dumps(asdict(self))
+        return self._packed
 
     @classmethod
     def unpack(cls: Type["Options"], data: str) -> "Options":
@@ -2,21 +2,92 @@
 from __future__ import annotations
 
 # std
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict
 import json
 import os
 import os.path
+import shutil
 from typing import Any, Union
 
+# external
+from redis import Redis
+
 # module
-from ._constants import _AnyPath
+from ._constants import _AnyPath, FUNSIES, hash_t, join
 from ._context import Connection, get_connection
 from ._funsies import Funsie, FunsieHow
 from ._graph import Artefact, get_data, Operation
 from ._shell import ShellOutput
+from ._storage import StorageEngine
 from .errors import UnwrapError
 from .ui import takeout
 
+# orjson is much faster than the standard library, but optional
+try:
+    # external
+    import orjson
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2)
+
+    _loads = orjson.loads
+
+except ImportError:
+
+    def _dumps(obj: Any) -> bytes:
+        # same output as orjson, which writes non-ascii characters as utf-8
+        return json.dumps(obj, sort_keys=True, indent=2, ensure_ascii=False).encode()
+
+    _loads = json.loads
+
+
+def _dump_json(path: str, obj: Any) -> None:
+    """Write a human-readable json file."""
+    with open(path, "wb") as f:
+        f.write(_dumps(obj))
+
+
+def _takeout_files(
+    db: Redis[bytes], store: StorageEngine, files: dict[str, tuple[Artefact, str]]
+) -> dict[str, Any]:
+    """Write artefacts to files and return errors for those with no data."""
+    # files often share directories, so we only make each of them once
+    for d in set(os.path.dirname(p) for _, p in files.values()):
+        os.makedirs(d, exist_ok=True)
+
+    # The same artefact can be used for many files, so we only take out the
+    # first one and copy it to the others.
+    firsts: dict[hash_t, str] = {}
+    copies: dict[str, str] = {}
+    for name, (val, _) in files.items():
+        if val.hash in firsts:
+            copies[name] = firsts[val.hash]
+        else:
+            firsts[val.hash] = name
+
+    # Files are written concurrently, as takeout() mostly waits on I/O.
+    with ThreadPoolExecutor() as executor:
+        jobs = dict(
+            (name, executor.submit(takeout, val, p, connection=(db, store)))
+            for name, (val, p) in files.items()
+            if name not in copies
+        )
+
+    errors = {}
+    for name, job in jobs.items():
+        try:
+            job.result()
+        except UnwrapError:
+            errors[name] = asdict(get_data(db, store, files[name][0]))
+
+    for name, source in copies.items():
+        if source in errors:
+            errors[name] = errors[source]
+        else:
+            shutil.copyfile(files[source][1], files[name][1])
+    return errors
+
 
 # ----------------------------------------------------------------------
 # Debugging functions
@@ -32,64 +103,38 @@ def shell(  # noqa:C901
     db, store = get_connection(connection)
     errors = {}
 
+    files = {}
     for key, val in shell_output.inp.items():
-        try:
-            p = os.path.join(inp, key)
-            os.makedirs(os.path.dirname(p), exist_ok=True)
-            takeout(val, p, connection=(db, store))
-        except UnwrapError:
-            errors[f"input:{key}"] = asdict(get_data(db, store, val))
-
+        files[f"input:{key}"] = (val, os.path.join(inp, key))
     for key, val in shell_output.out.items():
-        try:
-            p = os.path.join(out, key)
-            os.makedirs(os.path.dirname(p), exist_ok=True)
-            takeout(val, p, connection=(db, store))
-        except UnwrapError:
-            errors[f"output:{key}"] = asdict(get_data(db, store, val))
-
-    for i in range(len(shell_output.stdouts)):
-        try:
-            takeout(
-                shell_output.stdouts[i],
-                os.path.join(directory, f"stdout{i}"),
-                connection=(db, store),
-            )
-        except UnwrapError:
-            errors[f"stdout:{key}"] = asdict(get_data(db, store, val))
-
-        try:
-            takeout(
-                shell_output.stderrs[i],
-                os.path.join(directory, f"stderr{i}"),
-                connection=(db, store),
-            )
-        except UnwrapError:
-            errors[f"stderr:{key}"] = asdict(get_data(db, store, val))
-
-    with open(os.path.join(directory, "errors.json"), "w") as f:
-        f.write(
-            json.dumps(
-                errors,
-                sort_keys=True,
-                indent=2,
-            )
-        )
-
-    with open(os.path.join(directory, "operation.json"), "w") as f:
-        f.write(json.dumps(asdict(shell_output.op), sort_keys=True, indent=2))
-
-    extra = Funsie.grab(db, shell_output.op.funsie).extra
-    cmds = json.loads(extra["cmds"].decode())
-    env = json.loads(extra["env"].decode())
+        files[f"output:{key}"] = (val, os.path.join(out, key))
+
+    for i, (stdout, stderr) in enumerate(
+        zip(shell_output.stdouts, shell_output.stderrs)
+    ):
+        files[f"stdout:{i}"] = (stdout, os.path.join(directory, f"stdout{i}"))
+        files[f"stderr:{i}"] = (stderr, os.path.join(directory, f"stderr{i}"))
+
+    errors.update(_takeout_files(db, store, files))
+
+    _dump_json(os.path.join(directory, "errors.json"), errors)
+    _dump_json(os.path.join(directory, "operation.json"), asdict(shell_output.op))
+
+    # only the commands and environment are needed, not the full funsie
+    raw_cmds, raw_env = db.hmget(
+        join(FUNSIES, shell_output.op.funsie, "extra"), "cmds", "env"
+    )
+    if raw_cmds is None or raw_env is None:
+        raise RuntimeError(f"No shell funsie at {shell_output.op.funsie}")
+    cmds = _loads(raw_cmds)
+    env = _loads(raw_env)
     with open(os.path.join(directory, "op.sh"), "w") as f:
         f.write("\n".join(cmds))
         f.write("\n")
 
     if env is not None:
         with open(os.path.join(directory, "op.env"), "w") as f:
-            for key, val in env.items():
-                f.write(f"{key}={val}\n")
+            f.write("".join(f"{key}={val}\n" for key, val in env.items()))
 
 
 # --------------
@@ -102,8 +147,7 @@ def artefact(
     """Output content of any hash object to a file."""
     db, store = get_connection(connection)
     os.makedirs(directory, exist_ok=True)
-    with open(os.path.join(directory, "metadata.json"), "w") as f:
-        f.write(json.dumps(asdict(target), sort_keys=True, indent=2))
+    _dump_json(os.path.join(directory, "metadata.json"), asdict(target))
     try:
         takeout(
             target,
@@ -112,14 +156,9 @@ def artefact(
         )
     except UnwrapError:
         # dump error to json file
-        with open(os.path.join(directory, "error.json"), "w") as f:
-            f.write(
-                json.dumps(
-                    asdict(get_data(db, store, target)),
-                    sort_keys=True,
-                    indent=2,
-                )
-            )
+        _dump_json(
+            os.path.join(directory, "error.json"), asdict(get_data(db, store, target))
+        )
 
 
 def python(
@@ -144,32 +183,20 @@ def python(
     if funsie.how != FunsieHow.python:
         raise RuntimeError(f"Operation is of type {funsie.how}, not a python function.")
 
-    for key, v in target.inp.items():
-        val = Artefact[Any].grab(db, v)
-        try:
-            p = os.path.join(inp, key)
-            os.makedirs(os.path.dirname(p), exist_ok=True)
-            takeout(val, p, connection=(db, store))
-        except UnwrapError:
-            errors[f"input:{key}"] = asdict(get_data(db, store, val))
+    # grab all the artefacts at once
+    artefacts = Artefact[Any].grab_many(
+        db, [*target.inp.values(), *target.out.values()]
+    )
+    ninp = len(target.inp)
+    files = {}
+    for key, val in zip(target.inp, artefacts[:ninp]):
+        files[f"input:{key}"] = (val, os.path.join(inp, key))
+    for key, val in zip(target.out, artefacts[ninp:]):
+        files[f"output:{key}"] = (val, os.path.join(out, key))
 
-    for key, v in target.out.items():
-        val = Artefact.grab(db, v)
-        try:
-            p = os.path.join(out, key)
-            os.makedirs(os.path.dirname(p), exist_ok=True)
-            takeout(val, p, connection=(db, store))
-        except UnwrapError:
-            errors[f"output:{key}"] = asdict(get_data(db, store, val))
-
-    with open(os.path.join(directory, "errors.json"), "w") as f:
-        f.write(
-            json.dumps(
-                errors,
-                sort_keys=True,
-                indent=2,
-            )
-        )
+    errors.update(_takeout_files(db, store, files))
+
+    _dump_json(os.path.join(directory, "errors.json"), errors)
 
     meta = {
         "what": funsie.what,
@@ -177,11 +204,8 @@ def python(
         "out": funsie.out,
         "error_tolerant": funsie.error_tolerant,
     }
-    with open(os.path.join(directory, "funsie.json"), "w") as f:
-        f.write(json.dumps(meta, sort_keys=True, indent=2))
-
-    with open(os.path.join(directory, "operation.json"), "w") as f:
-        f.write(json.dumps(asdict(target), sort_keys=True, indent=2))
+    _dump_json(os.path.join(directory, "funsie.json"), meta)
+    _dump_json(os.path.join(directory, "operation.json"), asdict(target))
 
     # TODO
     # with open(os.path.join(directory, "function.pkl"), "wb") as f:
@@ -199,11 +223,15 @@ def anything(
     """Debug anything really."""
     db, store = get_connection(connection)
     if isinstance(obj, Operation):
-        funsie = Funsie.grab(db, obj.funsie)
-        if funsie.how == FunsieHow.shell:
+        # only the kind of funsie is needed to dispatch, shell() and python()
+        # load what they need themselves.
+        how = db.hget(join(FUNSIES, obj.funsie), "how")
+        if how is None:
+            raise RuntimeError(f"No funsie at {obj.funsie}")
+        if int(how) == FunsieHow.shell:
             shell_output = ShellOutput(db, obj)
             shell(shell_output, output, connection=(db, store))
-        elif funsie.how == FunsieHow.python:
+        elif int(how) == FunsieHow.python:
             python(obj, output, connection=(db, store))
         else:
             raise RuntimeError()
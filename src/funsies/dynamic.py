@@ -2,12 +2,13 @@
 from __future__ import annotations
 
 # std
+from functools import partial
 from typing import Any, Callable, Optional, Sequence, TypeVar
 
 # module
 from ._constants import _Data, Encoding
 from ._context import Connection, get_connection, get_options
-from ._graph import Artefact, constant_artefact, make_op
+from ._graph import Artefact, constant_artefacts, make_op
 from ._subdag import subdag_funsie
 from .config import Options
 from .ui import _Target, put
@@ -19,6 +20,22 @@ T2 = TypeVar("T2", bound=_Data)
 T3 = TypeVar("T3", bound=_Data)
 
 
+def __sac(
+    arg_names: Sequence[str],
+    split_fun: Callable[..., Sequence[T1]],
+    apply_fun: Callable[[Artefact[T1]], Artefact[T2]],
+    combine_fun: Callable[[Sequence[Artefact[T2]]], Artefact[T3]],
+    inpd: dict[str, Any],
+) -> dict[str, Artefact[T3]]:
+    """Perform the split/apply/combine."""
+    db, store = get_connection()
+    args = [inpd[k] for k in arg_names]
+    split_data = constant_artefacts(db, store, split_fun(*args))
+    apply_data = [apply_fun(d) for d in split_data]
+    combine_data = combine_fun(apply_data)
+    return dict(out=combine_data)
+
+
 def sac(
     split_fun: Callable[..., Sequence[T1]],
     apply_fun: Callable[[Artefact[T1]], Artefact[T2]],
@@ -34,17 +51,15 @@ def sac(
     opt = get_options(opt)
     db, store = get_connection(connection)
 
-    inputs: dict[str, Artefact] = {}
     # Parse input  -------------------------------------
-    inputs = {}
-    arg_names = []
-    for k, arg in enumerate(inp):
-        arg_names += [f"in{k}"]
+    inputs: dict[str, Artefact] = {}
+    arg_names = [f"in{k}" for k in range(len(inp))]
+    for arg_name, arg in zip(arg_names, inp):
         if isinstance(arg, Artefact):
-            inputs[arg_names[-1]] = arg
+            inputs[arg_name] = arg
         else:
-            inputs[arg_names[-1]] = put(arg, connection=db)
-    inp_types = dict([(k, val.kind) for k, val in inputs.items()])
+            inputs[arg_name] = put(arg, connection=db)
+    inp_types = {k: val.kind for k, val in inputs.items()}
 
     if name is not None:
         fun_name = name
@@ -54,16 +69,13 @@ def sac(
             + f"|{combine_fun.__qualname__}"
         )
 
-    def __sac(inpd: dict[str, Any]) -> dict[str, Artefact[T3]]:
-        """Perform the map reduce."""
-        db, store = get_connection()
-        args = [inpd[k] for k in arg_names]
-        split_data = [constant_artefact(db, store, d) for d in split_fun(*args)]
-        apply_data = [apply_fun(d) for d in split_data]
-        combine_data = combine_fun(apply_data)
-        return dict(out=combine_data)
-
     # Generate the subdag operations
-    cmd = subdag_funsie(__sac, inp_types, {"out": out}, name=fun_name, strict=strict)
+    cmd = subdag_funsie(
+        partial(__sac, tuple(arg_names), split_fun, apply_fun, combine_fun),
+        inp_types,
+        {"out": out},
+        name=fun_name,
+        strict=strict,
+    )
     operation = make_op(db, cmd, inputs, opt)
     return Artefact.grab(db, operation.out["out"])
@@ -42,6 +42,10 @@ class ErrorKind(str, Enum):
     KilledBySignal = "KilledBySignal"
 
 
+# Decoding from the raw bytes stored in redis without going through Enum lookup
+_KIND_BY_BYTES = dict((k.value.encode(), k) for k in ErrorKind)
+
+
 @dataclass
 class Error:
     """An Error value for artefacts."""
@@ -65,25 +69,16 @@ class Error:
     @classmethod
     def grab(cls: Type["Error"], db: Redis[bytes], hash: hash_t) -> "Error":
         """Grab an Error from the Redis store."""
-        if not join(ARTEFACTS, hash, "error"):
+        kind, source, details = db.hmget(
+            join(ARTEFACTS, hash, "error"), "kind", "source", "details"
+        )
+        if kind is None:
             raise RuntimeError(f"No error for artefact at {hash}")
-
-        data = db.hgetall(join(ARTEFACTS, hash, "error"))
-        kind = ErrorKind(data[b"kind"].decode())
-
-        # Sometimes the python boilerplate is really freaking annoying...
-        tmp = data.get(b"source", None)
-        if tmp is not None:
-            source: Optional[hash_t] = hash_t(tmp.decode())
-        else:
-            source = None
-        tmp = data.get(b"details", None)
-        if tmp is not None:
-            details: Optional[str] = tmp.decode()
-        else:
-            details = None
-
-        return Error(kind, source=source, details=details)
+        return Error(
+            _KIND_BY_BYTES[kind],
+            source=hash_t(source.decode()) if source is not None else None,
+            details=details.decode() if details is not None else None,
+        )
 
 
 # A simple mypy result type
@@ -116,9 +111,7 @@ def unwrap(it: Result[T]) -> T:
     """
     if isinstance(it, Error):
         raise UnwrapError(
-            f"data is errored: kind={it.kind}"
-            + f"\nsource={it.source}"
-            + f"\ndetails={it.details}"
+            f"data is errored: kind={it.kind}\nsource={it.source}\ndetails={it.details}"
         )
     else:
         return it
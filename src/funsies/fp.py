@@ -120,8 +120,8 @@ def py(  # noqa:C901
 
     noutputs = len(out)
     out_type = dict([(f"out{k}", out[k]) for k in range(noutputs)])
-    out_keys = list(out_type.keys())
-    in_keys = list(in_types.keys())
+    out_keys = tuple(out_type)
+    in_keys = tuple(in_types)
 
     if name is not None:
         fun_name = name
@@ -139,7 +139,7 @@ def py(  # noqa:C901
     funsie = python_funsie(__map, in_types, out_type, name=fun_name, strict=strict)
     operation = make_op(db, funsie, inputs, opt)
     returnval = tuple(
-        [Artefact.grab(db, operation.out[o]) for o in out_keys]  # type:ignore
+        Artefact.grab_many(db, [operation.out[o] for o in out_keys])  # type:ignore
     )
     if len(returnval) == 1:
         return returnval[0]
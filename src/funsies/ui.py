@@ -19,7 +19,7 @@ except ImportError:
 # module
 from ._constants import _AnyPath, _Data, hash_t
 from ._context import Connection, get_connection, get_options
-from ._dag import descendants, start_dag_execution
+from ._dag import descendants, submit_dag_execution
 from ._graph import (
     Artefact,
     constant_artefact,
@@ -73,8 +73,7 @@ def execute(
     db, _ = get_connection(connection)
 
     # run dag
-    for el in outputs:
-        start_dag_execution(db, el.hash)
+    submit_dag_execution(db, *[el.hash for el in outputs])
 
 
 # --------------------------------------------------------------------------------
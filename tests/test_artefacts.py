@@ -25,6 +25,25 @@ def test_artefact_add() -> None:
     assert c == b"bla bla"
 
 
+def test_artefact_add_many() -> None:
+    """Test adding many const artefacts at once."""
+    options()
+    server = MockServer()
+    db, store = server.new_connection()
+
+    arts = _graph.constant_artefacts(db, store, [b"bla bla", b"bla", b"bla bla"])
+    assert arts[0] == _graph.constant_artefact(db, store, b"bla bla")
+    assert arts[0] == arts[2]
+    for art, value in zip(arts, [b"bla bla", b"bla", b"bla bla"]):
+        data = _graph.get_data(db, store, art)
+        assert data == value
+
+    strs = _graph.constant_artefacts(db, store, ["bla", "bla bla"])
+    for sart, svalue in zip(strs, ["bla", "bla bla"]):
+        sdata = _graph.get_data(db, store, sart)
+        assert sdata == svalue
+
+
 def test_artefact_add_implicit() -> None:
     """Test adding implicit artefacts."""
     options()
@@ -56,6 +75,9 @@ def test_operation_pack() -> None:
     op2 = _graph.Operation.grab(db, op.hash)
     assert op == op2
 
+    op3 = _graph.make_op(db, fun, {"infile": b}, opt)
+    assert _graph.Operation.grab_many(db, [op.hash, op3.hash]) == [op, op3]
+
     with pytest.raises(AttributeError):
         op = _graph.make_op(db, fun, {}, opt)
 
@@ -70,6 +92,9 @@ def test_operation_pack() -> None:
     with pytest.raises(RuntimeError):
         op = _graph.Operation.grab(db, hash_t("b"))
 
+    with pytest.raises(RuntimeError):
+        _graph.Operation.grab_many(db, [op.hash, hash_t("b")])
+
 
 def test_artefact_wrong_type() -> None:
     """Test storing non-bytes in implicit artefacts."""
@@ -3,6 +3,8 @@ from __future__ import annotations
 
 # external
 import pytest
+from rq import Queue
+from rq.serializers import JSONSerializer
 
 # funsies
 from funsies import (
@@ -17,7 +19,7 @@ from funsies import (
     shell,
     take,
 )
-from funsies._constants import DAG_OPERATIONS, Encoding, hash_t, join
+from funsies._constants import DAG_INDEX, DAG_OPERATIONS, Encoding, hash_t, join
 from funsies.config import MockServer
 from funsies.utils import concat
 
@@ -45,6 +47,29 @@ def test_dag_build() -> None:
         # assert len(_dag.descendants(db, step1.hash)) == 1
 
 
+def test_dag_ancestors() -> None:
+    """Test ancestors and descendants of a diamond DAG."""
+    with Fun(MockServer()) as db:
+        dat = put(b"bla bla")
+        step1 = morph(lambda x: x.decode().upper().encode(), dat)
+        left = morph(lambda x: x + b"left", step1)
+        right = morph(lambda x: x + b"right", step1)
+        merge = concat(left, right)
+
+        assert _dag.ancestors(db, merge.parent) == {
+            step1.parent,
+            left.parent,
+            right.parent,
+        }
+        assert _dag.ancestors(db, step1.parent) == set()
+        assert _dag.descendants(db, step1.parent) == {
+            left.parent,
+            right.parent,
+            merge.parent,
+        }
+        assert _dag.descendants(db, merge.parent) == set()
+
+
 def test_dag_efficient() -> None:
     """Test that DAG building doesn't do extra work."""
     with Fun(MockServer()) as db:
@@ -68,6 +93,54 @@ def test_dag_efficient() -> None:
         assert len(_dag._dag_dependents(db, merge.hash, step1.parent)) == 2
 
 
+def test_dag_pruned() -> None:
+    """Test that cached operations are pruned from DAGs."""
+    with Fun(MockServer(), defaults=options(distributed=False)) as db:
+        dat = put(b"bla bla")
+        step1 = morph(lambda x: x.decode().upper().encode(), dat)
+        step2 = morph(lambda x: x + b"!", step1)
+        step3 = shell("cat file1", inp=dict(file1=step2))
+        execute(step2)
+
+        ready = _dag.build_dag(db, step3.stdout.hash)
+        assert ready == {step3.hash}
+        assert db.smembers(join(DAG_OPERATIONS, step3.stdout.hash)) == {
+            step3.hash.encode()
+        }
+
+        # the requested operation is always kept
+        ready = _dag.build_dag(db, step2.hash)
+        assert ready == {step2.parent}
+
+
+def test_dag_execute_cached() -> None:
+    """Test that executing cached operations does not build a DAG."""
+    with Fun(MockServer(), defaults=options(distributed=False)) as db:
+        dat = put(b"bla bla")
+        step1 = morph(lambda x: x.decode().upper().encode(), dat)
+        execute(step1)
+        _dag.delete_all_dags(db)
+
+        execute(step1)
+        assert len(db.smembers(DAG_INDEX)) == 0
+        assert take(step1) == b"BLA BLA"
+
+
+def test_dag_build_job_options() -> None:
+    """Test that DAG build jobs do not inherit operation timeouts."""
+    with Fun(
+        MockServer(), defaults=options(timeout=1, queue="q", distributed=True)
+    ) as db:
+        dat = put(b"build job")
+        step1 = morph(lambda x: x.decode().upper().encode(), dat)
+        execute(step1)
+
+        queue = Queue("q", connection=db, serializer=JSONSerializer)
+        (job,) = queue.get_jobs()
+        assert job.func_name == "funsies._dag.build_dag_task"
+        assert job.timeout == -1
+
+
 def test_dag_cached() -> None:
     """Test that DAG caching works."""
     serv = MockServer()
@@ -1,10 +1,11 @@
 """Test debugging functions."""
 # std
+import json
 import os.path
 import tempfile
 
 # funsies
-from funsies import debug, Fun, shell
+from funsies import debug, Fun, morph, put, shell
 from funsies._context import get_connection
 from funsies._run import run_op
 from funsies.config import MockServer
@@ -41,7 +42,10 @@ def test_shell_norun() -> None:
             assert "output_files" in n
 
             with open(os.path.join(d, "errors.json"), "r") as f:
-                assert "NotFound" in f.read()
+                errors = json.load(f)
+            assert "NotFound" in errors["output:bla"]["kind"]
+            assert "NotFound" in errors["stdout:0"]["kind"]
+            assert "NotFound" in errors["stderr:0"]["kind"]
 
 
 def test_artefact() -> None:
@@ -62,3 +66,29 @@ def test_artefact() -> None:
             assert "metadata.json" in n
             assert "error.json" not in n
             assert "data" in n
+
+
+def test_python() -> None:
+    """Test python debug."""
+    with Fun(MockServer()):
+        db, store = get_connection()
+        dat = put(b"bla bla")
+        step = morph(lambda x: x.upper(), dat)
+        _ = run_op(db, store, step.parent)
+
+        with tempfile.TemporaryDirectory() as d:
+            debug.python(step, d)
+            n = os.listdir(d)
+            assert "funsie.json" in n
+            assert "operation.json" in n
+            assert os.listdir(os.path.join(d, "inputs")) == ["in0"]
+            assert os.listdir(os.path.join(d, "outputs")) == ["out0"]
+            with open(os.path.join(d, "outputs", "out0"), "rb") as f:
+                assert f.read() == b"BLA BLA"
+
+
+def test_dumps() -> None:
+    """Test that json dumps do not depend on whether orjson is installed."""
+    obj = {"b": [1, 2.5, {}], "a": 'é ✓ "x"\n', "c": None}
+    expected = json.dumps(obj, sort_keys=True, indent=2, ensure_ascii=False)
+    assert debug._dumps(obj) == expected.encode()
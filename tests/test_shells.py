@@ -2,10 +2,16 @@
 # std
 from io import BytesIO
 import os
+import tempfile
+from typing import Any
+
+# external
+import pytest
 
 # funsies
 from funsies import _shell as s
-from funsies.types import Encoding
+from funsies._storage import DiskStorage
+from funsies.types import Encoding, Error, hash_t
 
 
 def test_shell_wrap() -> None:
@@ -31,6 +37,32 @@ def test_shell_cp() -> None:
     assert out["file2"] == b"bla bla"
 
 
+def test_shell_disk_input(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test staging inputs from files on disk."""
+
+    def no_sendfile(*args: Any) -> int:
+        raise OSError("not supported")
+
+    cmd = s.shell_funsie(["cat file1"], {"file1": Encoding.blob}, [])
+    with tempfile.TemporaryDirectory() as td:
+        store = DiskStorage(td)
+        key = store.get_key(hash_t("12345678"))
+        store.put(key, BytesIO(b"bla bla" * 1000))
+
+        for patch in [None, "oserror", "missing"]:
+            with monkeypatch.context() as m:
+                if patch == "oserror":
+                    m.setattr("funsies._shell.os.sendfile", no_sendfile)
+                elif patch == "missing":
+                    m.delattr(os, "sendfile")
+
+                stream = store.take(key)
+                assert not isinstance(stream, Error)
+                with stream:
+                    out = s.run_shell_funsie(cmd, {"file1": stream})
+                assert out[f"{s.STDOUT}0"] == b"bla bla" * 1000
+
+
 def test_shell_env() -> None:
     """Test env variables in shell funsie."""
     cmd = s.shell_funsie(["echo $VARIABLE"], {}, [], env={"VARIABLE": "bla"})
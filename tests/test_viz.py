@@ -2,6 +2,8 @@
 from __future__ import annotations
 
 # std
+import os.path
+import tempfile
 from typing import Any, Sequence
 
 # funsies
@@ -65,8 +67,9 @@ def test_dag_dump() -> None:
         assert len(labels) == 8
 
         # TODO pass through dot for testing?
-        with open("g.dot", "w") as f:
-            f.write(dot)
+        with tempfile.TemporaryDirectory() as td:
+            with open(os.path.join(td, "g.dot"), "w") as f:
+                f.write(dot)
 
 
 def test_dynamic_dump() -> None: